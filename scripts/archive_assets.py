@@ -8,9 +8,11 @@ import sys
 import zipfile
 from pathlib import Path
 
-import requests
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.ratelimit import request  # noqa: E402
+
 load_dotenv()
 HF_TOKEN = os.getenv("HUGGINGFACE_TOKEN")
 if not HF_TOKEN:
@@ -26,10 +28,13 @@ def create_zip(files: list[Path], out_path: Path) -> Path:
 def upload_zip(zip_path: Path, repo: str) -> None:
     headers = {"Authorization": f"Bearer {HF_TOKEN}"}
     with zip_path.open("rb") as f:
-        resp = requests.post(
+        resp = request(
+            "huggingface",
+            "POST",
             f"https://huggingface.co/api/datasets/{repo}/upload",
             headers=headers,
             files={"file": (zip_path.name, f)},
+            timeout=300,
         )
     print("HuggingFace:", resp.status_code)
 
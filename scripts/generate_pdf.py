@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
-"""Convert a markdown digest to PDF using pandoc."""
+"""Convert a markdown digest to PDF using pandoc.
+
+Pandoc is fed the ``pdf`` emitter output of the shared digest AST and is
+skipped when that input is unchanged since the last run.
+"""
 
 from __future__ import annotations
 
@@ -9,6 +13,9 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.render import shared_renderer  # noqa: E402
+
 
 def sha256_of(path: Path) -> str:
     data = path.read_bytes()
@@ -19,6 +26,13 @@ def generate_pdf(md_path: Path, out_dir: Path) -> Path:
     if not md_path.exists():
         raise FileNotFoundError(md_path)
     out_dir.mkdir(parents=True, exist_ok=True)
+    pdf_path = out_dir / (md_path.stem + ".pdf")
+
+    renderer = shared_renderer()
+    source = renderer.render(renderer.load(md_path), "pdf")
+    if not renderer.changed(f"{md_path.stem}:pdf", source) and pdf_path.exists():
+        print(f"✔ PDF up to date at {pdf_path}")
+        return pdf_path
 
     sha = sha256_of(md_path)
     date = datetime.utcnow().strftime("%Y-%m-%d")
@@ -26,14 +40,15 @@ def generate_pdf(md_path: Path, out_dir: Path) -> Path:
     # Append footer with metadata
     footer = f"\n\n---\nGenerated {date} | version {version} | SHA256 {sha}\n"
     temp_md = out_dir / (md_path.stem + "_tmp.md")
-    temp_md.write_text(md_path.read_text(encoding="utf-8") + footer, encoding="utf-8")
+    temp_md.write_text(source + footer, encoding="utf-8")
 
-    pdf_path = out_dir / (md_path.stem + ".pdf")
     subprocess.run(
         ["pandoc", str(temp_md), "--pdf-engine=xelatex", "-o", str(pdf_path)],
         check=True,
     )
     temp_md.unlink()
+    renderer.mark(f"{md_path.stem}:pdf", source)
+    renderer.save()
     print(f"✔ PDF generated at {pdf_path}")
     return pdf_path
 
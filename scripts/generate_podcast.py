@@ -10,11 +10,16 @@ from pathlib import Path
 import openai
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.ratelimit import OPENAI_TIMEOUT, limiter  # noqa: E402
+from src.render import shared_renderer  # noqa: E402
+
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     sys.exit("OPENAI_API_KEY not set")
 openai.api_key = OPENAI_API_KEY
+openai.max_retries = 0  # 429s and 5xx are retried by the openai limiter
 
 PROMPT = (
     "Compress the following digest into a 500-700 word podcast script. "
@@ -23,16 +28,29 @@ PROMPT = (
 
 
 def generate_script(md_path: Path, out_dir: Path) -> Path:
-    text = md_path.read_text(encoding="utf-8")
+    out_file = out_dir / f"{md_path.stem}_script.txt"
+    renderer = shared_renderer()
+    text = renderer.render(renderer.load(md_path), "podcast")
+    if not renderer.changed(f"{md_path.stem}:podcast", text) and out_file.exists():
+        print(f"✔ Podcast script up to date at {out_file}")
+        return out_file
+
     messages = [
         {"role": "system", "content": PROMPT},
         {"role": "user", "content": text},
     ]
-    resp = openai.ChatCompletion.create(model="gpt-4o", messages=messages, temperature=0.4)
+    resp = limiter("openai").call(
+        openai.chat.completions.create,
+        model="gpt-4o",
+        messages=messages,
+        temperature=0.4,
+        timeout=OPENAI_TIMEOUT,
+    )
     script = resp.choices[0].message.content.strip()
     out_dir.mkdir(parents=True, exist_ok=True)
-    out_file = out_dir / f"{md_path.stem}_script.txt"
     out_file.write_text(script, encoding="utf-8")
+    renderer.mark(f"{md_path.stem}:podcast", text)
+    renderer.save()
     print(f"✔ Podcast script saved to {out_file}")
     return out_file
 
@@ -8,9 +8,11 @@ import os
 import sys
 from pathlib import Path
 
-import requests
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.ratelimit import request  # noqa: E402
+
 load_dotenv()
 EL_API = os.getenv("ELEVENLABS_API_KEY")
 TRANSISTOR_API = os.getenv("TRANSISTOR_API_KEY")
@@ -30,10 +32,13 @@ def synthesize(script_path: Path, out_dir: Path) -> tuple[Path, Path]:
         "text": text,
         "voice_settings": {"stability": 0.5, "similarity_boost": 0.75},
     }
-    resp = requests.post(
+    resp = request(
+        "elevenlabs",
+        "POST",
         f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}",
         headers=headers,
         data=json.dumps(payload),
+        timeout=120,
     )
     resp.raise_for_status()
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -49,8 +54,16 @@ def synthesize(script_path: Path, out_dir: Path) -> tuple[Path, Path]:
 
 def upload_to_transistor(mp3: Path, transcript: Path) -> None:
     headers = {"x-api-key": TRANSISTOR_API}
-    files = {"audio_file": mp3.open("rb"), "transcript": transcript.open("rb")}
-    resp = requests.post("https://api.transistor.fm/v1/episodes", headers=headers, files=files)
+    with mp3.open("rb") as audio, transcript.open("rb") as text:
+        files = {"audio_file": audio, "transcript": text}
+        resp = request(
+            "transistor",
+            "POST",
+            "https://api.transistor.fm/v1/episodes",
+            headers=headers,
+            files=files,
+            timeout=300,
+        )
     print("Transistor:", resp.status_code)
 
 
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""Append digest metadata to metadata/content_index.csv."""
+"""Append digest metadata to metadata/content_index.csv and update the search index."""
 
 from __future__ import annotations
 
@@ -9,6 +9,9 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.search_index import SearchIndex  # noqa: E402
+
 
 def compute_sha(path: Path) -> str:
     return hashlib.sha256(path.read_bytes()).hexdigest()
@@ -26,6 +29,10 @@ def update_csv(md_path: Path, pdf: Path, mp3: Path, social: Path, version: str =
             writer.writerow(["date", "title", "pdf_path", "podcast_path", "social_path", "sha256", "version"])
         writer.writerow(row)
     print(f"✔ Metadata row appended to {csv_path}")
+    with SearchIndex() as index:
+        # Date comes from the digest's filename or front-matter, not the run date.
+        if index.index_digest(md_path, social):
+            print(f"✔ Search index updated at {index.path}")
 
 
 if __name__ == "__main__":
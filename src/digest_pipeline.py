@@ -4,8 +4,8 @@ Ohmbudsman Digest pipeline – single-file version
 ------------------------------------------------
 1. Fetch all Readwise articles tagged with READWISE_TAG from the past 24 h
 2. Summarise in Disguised-SNAP via OpenAI Assistant (mini-4o-high)
-3. Assemble markdown with front-matter and push a **draft** to Buttondown
-   (no auto-send)
+3. Assemble markdown with front-matter and upsert today's **draft** in
+   Buttondown (no auto-send; reruns update the same draft)
 
 ENV VARS required
 ──────────────────────────────────────────────────────────────────────────
@@ -16,12 +16,15 @@ READWISE_TAG     – Tag to filter (default: ohmbudsman)
 """
 
 from __future__ import annotations
-import os, sys, json, math, time, textwrap
+import os, sys, json, math, textwrap
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-import requests, openai
+import openai
 from dotenv import load_dotenv
 
+from publisher import ButtondownPublisher, build_body, digest_subject
+from ratelimit import OPENAI_TIMEOUT, limiter, request
+
 # ─── env ─────────────────────────────────────────────────────────────────
 load_dotenv()
 RW_TOKEN  = os.getenv("READWISE_TOKEN")
@@ -33,6 +36,7 @@ if not (RW_TOKEN and OPENAI_KEY and BD_TOKEN):
     sys.exit("❌ Missing one of READWISE_TOKEN / OPENAI_API_KEY / BUTTONDOWN_TOKEN")
 
 openai.api_key = OPENAI_KEY
+openai.max_retries = 0  # 429s and 5xx are retried by the openai limiter
 ASSISTANT_ID   = "asst_aumVzFe2kUL0u0K0H88owQ1F"
 MODEL          = "gpt-4o-mini-high"
 
@@ -47,13 +51,12 @@ params={"updatedAfter": cutoff, "page_size":1000, "category":"article","tags":TA
 hdr   = {"Authorization":f"Token {RW_TOKEN}"}
 
 while True:
-    r=requests.get(base,headers=hdr,params=params,timeout=30)
+    r=request("readwise","GET",base,headers=hdr,params=params)
     r.raise_for_status()
     d=r.json(); docs.extend(d.get("results",[]))
     cursor=d.get("nextPageCursor")
     if not cursor: break
     params={"page_size":1000,"pageCursor":cursor}
-    time.sleep(.2)
 
 if not docs:
     sys.exit(f"❌ No articles tagged #{TAG} in past 24 h")
@@ -79,7 +82,9 @@ def call_openai(chunk:str)->str:
     )
     messages=[{"role":"system","content":system},
               {"role":"user","content":f"Summarise the following JSON list of articles:\n{chunk}"}]
-    resp=openai.ChatCompletion.create(model=MODEL,messages=messages,temperature=0.3)
+    resp=limiter("openai").call(openai.chat.completions.create,
+                                 model=MODEL,messages=messages,temperature=0.3,
+                                 timeout=OPENAI_TIMEOUT)
     return resp.choices[0].message.content.strip()
 
 parts=[call_openai(c) for c in chunks]
@@ -95,12 +100,8 @@ out=Path("output"); out.mkdir(parents=True,exist_ok=True)
 (out/"digest_output.md").write_text(full_md,encoding="utf-8")
 print("✔ Saved output/digest_output.md")
 
-# ─── 4. post draft to Buttondown ────────────────────────────────────────
-headers_bd={"Authorization":f"Token {BD_TOKEN}","Content-Type":"application/json"}
-payload_bd={"subject":f"Ohmbudsman Digest — {today}","body":full_md,"status":"draft"}
-resp_bd=requests.post("https://api.buttondown.com/v1/emails",
-                      headers=headers_bd,json=payload_bd,timeout=30)
-print("Buttondown status:",resp_bd.status_code)
-print(resp_bd.text)
-resp_bd.raise_for_status()
-print("✔ Draft created successfully")
+# ─── 4. upsert draft in Buttondown ──────────────────────────────────────
+with ButtondownPublisher(BD_TOKEN) as publisher:
+    result=publisher.publish(digest_subject(today),build_body(full_md,today))
+print(f"Buttondown draft {result.email_id}: {result.action}")
+print("✔ Draft up to date")
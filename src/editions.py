@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""Multi-edition digests from a single Readwise Reader sweep.
+
+Editions are declared in ``config/feeds.yml``.  One paginated sweep fetches
+every document updated within the longest edition lookback; an in-memory
+:class:`TagIndex` then routes documents to each edition by tag, category and
+lookback, so Reader API calls grow with the number of new documents rather
+than with documents × editions.  Editions are summarised concurrently and,
+when ``BUTTONDOWN_TOKEN`` is set, upserted as Buttondown drafts in one batch.
+
+ENV VARS
+──────────────────────────────────────────────────────────────────────────
+READWISE_TOKEN   – Readwise API token               (required)
+OPENAI_API_KEY   – OpenAI key                       (required)
+BUTTONDOWN_TOKEN – Buttondown API token             (optional)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+import requests
+import yaml
+from dotenv import load_dotenv
+
+try:
+    from .publisher import ButtondownPublisher, build_body, digest_subject
+    from .ratelimit import OPENAI_TIMEOUT, limiter, request, snapshot
+    from .search_index import INDEX_FILE, SearchIndex
+except ImportError:  # executed as ``python src/editions.py``
+    from publisher import ButtondownPublisher, build_body, digest_subject
+    from ratelimit import OPENAI_TIMEOUT, limiter, request, snapshot
+    from search_index import INDEX_FILE, SearchIndex
+
+__all__ = [
+    "Edition",
+    "TagIndex",
+    "fetch_reader_docs",
+    "load_editions",
+    "shared_category",
+    "summarise_editions",
+]
+
+ROOT = Path(__file__).resolve().parents[1]
+FEEDS_FILE = ROOT / "config" / "feeds.yml"
+OUTPUT_DIR = Path("output/editions")
+API_URL = "https://readwise.io/api/v3/list/"
+MODEL = "gpt-4o-mini"
+MAX_WORKERS = 4
+PAGE_SIZE = 1000  # Reader's maximum; the list endpoint allows 20 requests/minute
+
+
+# ── Configuration ─────────────────────────────────────────────────────
+
+
+@dataclass
+class Edition:
+    """One topical digest routed out of the shared Reader sweep."""
+
+    name: str
+    slug: str
+    tags: List[str] = field(default_factory=list)
+    categories: List[str] = field(default_factory=list)
+    lookback_hours: int = 24
+    prompt: str = ""
+
+    def __post_init__(self) -> None:
+        self.tags = [t.lower() for t in self.tags]
+        self.categories = [c.lower() for c in self.categories]
+
+
+def _resolve_prompt(prompt: str) -> str:
+    path = ROOT / prompt
+    if prompt and len(prompt) < 256 and path.is_file():
+        return path.read_text(encoding="utf-8")
+    return prompt
+
+
+def load_editions(path: Path = FEEDS_FILE) -> List[Edition]:
+    """Read edition definitions from ``feeds.yml``, applying ``defaults``."""
+
+    config = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    if not isinstance(config, dict) or not config.get("editions"):
+        raise ValueError(f"{path} must define a non-empty 'editions' list")
+
+    defaults = config.get("defaults") or {}
+    editions = []
+    for entry in config["editions"]:
+        merged = {**defaults, **entry}
+        merged.setdefault("slug", re.sub(r"[^a-z0-9]+", "-", merged["name"].lower()).strip("-"))
+        merged["prompt"] = _resolve_prompt(str(merged.get("prompt") or ""))
+        for key in ("tags", "categories"):
+            if isinstance(merged.get(key), str):
+                merged[key] = [merged[key]]
+        editions.append(Edition(**merged))
+    return editions
+
+
+# ── Reader sweep and routing ──────────────────────────────────────────
+
+
+def iso_utc(dt: datetime) -> str:
+    """Return an ISO-8601 UTC timestamp ending in 'Z'."""
+    return dt.astimezone(timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+def shared_category(editions: Iterable[Edition]) -> str | None:
+    """Return the one category every edition is limited to, if there is one."""
+
+    categories = {tuple(e.categories) for e in editions}
+    if len(categories) == 1:
+        (only,) = categories
+        if len(only) == 1:
+            return only[0]
+    return None
+
+
+def fetch_reader_docs(
+    token: str,
+    updated_after: str,
+    session: requests.Session | None = None,
+    category: str | None = None,
+) -> List[Dict]:
+    """Page once through Reader's list endpoint, unfiltered by tag.
+
+    ``category`` is filtered server-side; pass it when every edition shares it
+    (see :func:`shared_category`).
+    """
+
+    http = session or requests.Session()
+    headers = {"Authorization": f"Token {token}"}
+    query: Dict[str, str | int] = {"updatedAfter": updated_after, "page_size": PAGE_SIZE}
+    if category:
+        query["category"] = category
+    params = query
+    docs: List[Dict] = []
+    while True:
+        resp = request("readwise", "GET", API_URL, session=http, headers=headers, params=params)
+        resp.raise_for_status()
+        data = resp.json()
+        docs.extend(data.get("results", []))
+        cursor = data.get("nextPageCursor")
+        if not cursor:
+            return docs
+        params = {**query, "pageCursor": cursor}
+
+
+def _doc_tags(doc: Dict) -> Iterable[str]:
+    tags = doc.get("tags") or {}
+    # Reader returns tags as a mapping keyed by tag name; tolerate lists too.
+    names = tags.keys() if isinstance(tags, dict) else tags
+    return (str(t).lower() for t in names)
+
+
+def _parse_ts(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+class TagIndex:
+    """In-memory tag/category index over one Reader sweep."""
+
+    def __init__(self, docs: List[Dict]) -> None:
+        self.docs = docs
+        self.by_tag: Dict[str, set[int]] = defaultdict(set)
+        self.by_category: Dict[str, set[int]] = defaultdict(set)
+        self.updated = [_parse_ts(d.get("updated_at")) for d in docs]
+        for i, doc in enumerate(docs):
+            for tag in _doc_tags(doc):
+                self.by_tag[tag].add(i)
+            self.by_category[str(doc.get("category", "")).lower()].add(i)
+
+    def route(self, edition: Edition, now: datetime | None = None) -> List[Dict]:
+        """Return the documents belonging to ``edition``, in sweep order."""
+
+        ids = set(range(len(self.docs)))
+        if edition.tags:
+            ids = set().union(*(self.by_tag.get(t, set()) for t in edition.tags))
+        if edition.categories:
+            ids &= set().union(*(self.by_category.get(c, set()) for c in edition.categories))
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(hours=edition.lookback_hours)
+        return [
+            self.docs[i]
+            for i in sorted(ids)
+            if self.updated[i] is None or self.updated[i] >= cutoff
+        ]
+
+
+# ── Summarisation ─────────────────────────────────────────────────────
+
+
+def _brief(doc: Dict) -> Dict:
+    return {
+        "title": doc.get("title", "Untitled"),
+        "link": doc.get("url") or doc.get("source_url", ""),
+        "published": doc.get("published_date", ""),
+        "summary": doc.get("summary", ""),
+    }
+
+
+def previous_coverage(docs: List[Dict], limit: int = 5) -> str:
+    """Summarise past digest sections related to ``docs`` from the search index."""
+
+    if not INDEX_FILE.exists():
+        return ""
+    with SearchIndex(INDEX_FILE) as index:
+        hits = index.previously_covered(" ".join(d.get("title") or "" for d in docs), limit)
+    return "\n".join(f"- {h.date} · {h.section}: {h.snippet}" for h in hits)
+
+
+def summarise_edition(edition: Edition, docs: List[Dict]) -> str:
+    """Summarise ``docs`` into Disguised-SNAP markdown for ``edition``."""
+
+    import openai
+
+    history = previous_coverage(docs)
+    messages = [
+        {"role": "system", "content": edition.prompt},
+        {
+            "role": "user",
+            "content": f"Summarise these {edition.name} articles in Disguised-SNAP format:\n"
+            + json.dumps([_brief(d) for d in docs], indent=2),
+        },
+    ]
+    if history:
+        messages.append(
+            {
+                "role": "user",
+                "content": "Previously covered in past digests; note developments "
+                "instead of repeating them:\n" + history,
+            }
+        )
+    resp = limiter("openai").call(
+        openai.chat.completions.create,
+        model=MODEL,
+        messages=messages,
+        temperature=0.3,
+        timeout=OPENAI_TIMEOUT,
+    )
+    return resp.choices[0].message.content.strip()
+
+
+def summarise_editions(
+    routed: Dict[str, tuple[Edition, List[Dict]]],
+    summarise: Callable[[Edition, List[Dict]], str] = summarise_edition,
+    max_workers: int = MAX_WORKERS,
+) -> tuple[Dict[str, str], Dict[str, Exception]]:
+    """Summarise every non-empty edition concurrently.
+
+    Returns ``(digests, errors)`` keyed by slug, so one failing edition does
+    not discard the others.
+    """
+
+    jobs = {slug: pair for slug, pair in routed.items() if pair[1]}
+    digests: Dict[str, str] = {}
+    errors: Dict[str, Exception] = {}
+    if not jobs:
+        return digests, errors
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        futures = {slug: pool.submit(summarise, ed, docs) for slug, (ed, docs) in jobs.items()}
+        for slug, fut in futures.items():
+            try:
+                digests[slug] = fut.result()
+            except Exception as exc:
+                errors[slug] = exc
+    return digests, errors
+
+
+# ── Main ──────────────────────────────────────────────────────────────
+
+
+def main() -> None:
+    load_dotenv()
+    rw_token = os.getenv("READWISE_TOKEN")
+    openai_key = os.getenv("OPENAI_API_KEY")
+    if not (rw_token and openai_key):
+        sys.exit("❌ Missing READWISE_TOKEN or OPENAI_API_KEY")
+
+    import openai
+
+    openai.api_key = openai_key
+    openai.max_retries = 0  # 429s and 5xx are retried by the openai limiter
+
+    editions = load_editions()
+    now = datetime.now(timezone.utc)
+    lookback = max(e.lookback_hours for e in editions)
+    docs = fetch_reader_docs(
+        rw_token, iso_utc(now - timedelta(hours=lookback)), category=shared_category(editions)
+    )
+    print(f"✔ Swept {len(docs)} Reader documents for {len(editions)} editions")
+
+    index = TagIndex(docs)
+    routed = {e.slug: (e, index.route(e, now)) for e in editions}
+    for slug, (_, edition_docs) in routed.items():
+        print(f"  • {slug}: {len(edition_docs)} documents")
+
+    digests, errors = summarise_editions(routed)
+    for slug, exc in errors.items():
+        print(f"❌ {slug}: {exc}")
+    if not digests:
+        sys.exit("❌ No edition was summarised" if errors else "❌ No documents matched any edition")
+
+    today = now.strftime("%Y-%m-%d")
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    outgoing = []
+    for slug, md in digests.items():
+        edition = routed[slug][0]
+        subject = digest_subject(today, edition.name)
+        body = build_body(md, today, title=subject)
+        (OUTPUT_DIR / f"{slug}.md").write_text(body, encoding="utf-8")
+        outgoing.append((subject, body))
+    print(f"✔ Saved {len(digests)} editions to {OUTPUT_DIR}")
+
+    bd_token = os.getenv("BUTTONDOWN_TOKEN")
+    if bd_token:
+        with ButtondownPublisher(bd_token) as publisher:
+            for result in publisher.publish_many(outgoing):
+                print(f"Buttondown draft {result.email_id} ({result.subject}): {result.action}")
+
+    for stats in snapshot().values():
+        print(
+            f"  {stats.name}: {stats.requests} calls, {stats.throttled} throttled, "
+            f"rate {stats.rate:.2f}/s, circuit {stats.state}"
+        )
+    if errors:
+        sys.exit(f"❌ {len(errors)} edition(s) failed: {', '.join(errors)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,9 +13,10 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, List
 
-import requests
 from dotenv import load_dotenv
 
+from ratelimit import request
+
 # ── Configuration ─────────────────────────────────────────────────────
 
 load_dotenv()  # for local development
@@ -59,7 +60,7 @@ def fetch_reader_docs(updated_after: str) -> List[Dict]:
         if next_cursor:
             params["pageCursor"] = next_cursor
 
-        resp = requests.get(API_URL, headers=headers, params=params, timeout=30)
+        resp = request("readwise", "GET", API_URL, headers=headers, params=params)
         resp.raise_for_status()
         data = resp.json()
 
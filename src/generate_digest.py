@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 1) Fetch all articles updated in the last 24 hours from Readwise Reader.
-2) Summarize them using OpenAI’s ChatCompletion in strict Disguised-SNAP format.
+2) Summarize them using OpenAI’s chat completions API in strict Disguised-SNAP format.
 3) Save the markdown to output/digest_output.md.
 """
 
@@ -11,10 +11,11 @@ import json
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 
-import requests
 import openai
 from dotenv import load_dotenv
 
+from ratelimit import OPENAI_TIMEOUT, limiter, request
+
 # ─── Load environment ────────────────────────────────────────────────────
 load_dotenv()
 READWISE_TOKEN = os.getenv("READWISE_TOKEN")
@@ -24,6 +25,7 @@ if not READWISE_TOKEN or not OPENAI_KEY:
     sys.exit("❌ Missing READWISE_TOKEN or OPENAI_API_KEY")
 
 openai.api_key = OPENAI_KEY
+openai.max_retries = 0  # 429s and 5xx are retried by the openai limiter
 
 # ─── Fetch Reader articles ───────────────────────────────────────────────
 cutoff = (datetime.utcnow() - timedelta(days=1)) \
@@ -36,11 +38,12 @@ params = {
 }
 headers_rw = {"Authorization": f"Token {READWISE_TOKEN}"}
 
-resp = requests.get(
+resp = request(
+    "readwise",
+    "GET",
     "https://readwise.io/api/v3/list/",
     headers=headers_rw,
     params=params,
-    timeout=30
 )
 if resp.status_code != 200:
     print("Readwise API error:", resp.status_code, resp.text, file=sys.stderr)
@@ -65,10 +68,12 @@ messages = [
 
 # ─── Call OpenAI ChatCompletion ───────────────────────────────────────────
 print("→ Calling OpenAI ChatCompletion...")
-chat_resp = openai.ChatCompletion.create(
+chat_resp = limiter("openai").call(
+    openai.chat.completions.create,
     model="gpt-4o-mini",
     messages=messages,
     temperature=0.3,
+    timeout=OPENAI_TIMEOUT,
 )
 
 digest_md = chat_resp.choices[0].message.content
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Idempotent Buttondown publisher for Disguised-SNAP digests.
+
+Every edition is *upserted* as a draft: an existing draft with the same
+subject is looked up and PATCHed, and nothing is sent at all when the
+SHA-256 of the prepared subject + body matches what Buttondown already holds.
+Several editions can be published through one pooled :class:`requests.Session`;
+throttling and retries go through the shared ``buttondown`` rate limiter.
+
+``BUTTONDOWN_API_URL`` overrides the API root so the publisher can be pointed
+at a local stand-in server.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from .ratelimit import request
+    from .render import Renderer, parse
+except ImportError:  # executed from ``python src/<script>.py``
+    from ratelimit import request
+    from render import Renderer, parse
+
+__all__ = [
+    "ButtondownPublisher",
+    "PublishResult",
+    "build_body",
+    "content_hash",
+    "digest_subject",
+]
+
+API_URL = "https://api.buttondown.com/v1"
+SUBJECT_PREFIX = "Ohmbudsman Digest"
+
+
+# ── Payload preparation ───────────────────────────────────────────────
+
+
+def digest_subject(date: str, edition: str | None = None) -> str:
+    """Return the email subject for ``date`` (and optional edition name)."""
+
+    if edition:
+        return f"{SUBJECT_PREFIX}: {edition} — {date}"
+    return f"{SUBJECT_PREFIX} — {date}"
+
+
+def build_body(md: str, date: str, title: str | None = None) -> str:
+    """Normalise digest markdown into the body sent to Buttondown.
+
+    The digest is parsed into the shared AST and rendered with the ``email``
+    emitter, which drops any existing front-matter; a single canonical
+    front-matter block is then prepended, so the same digest always produces
+    the same body regardless of which stage wrote the file.
+    """
+
+    content = Renderer().render(parse(md), "email")
+    quoted = json.dumps(title or digest_subject(date), ensure_ascii=False)  # valid YAML
+    front = (
+        f"---\n"
+        f"title: {quoted}\n"
+        f"date: {date}\n"
+        f"author: Ohmbudsman\n"
+        f"license: CC-BY-NC\n"
+        f"---\n\n"
+    )
+    return front + content
+
+
+def content_hash(subject: str, body: str) -> str:
+    """SHA-256 over subject and body, ignoring trailing whitespace."""
+
+    data = f"{subject.strip()}\n\0\n{body.rstrip()}"
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+# ── Publisher ─────────────────────────────────────────────────────────
+
+
+@dataclass
+class PublishResult:
+    """Outcome of publishing one edition."""
+
+    subject: str
+    action: str  # "created", "updated" or "unchanged"
+    email_id: str
+    sha256: str
+
+
+class ButtondownPublisher:
+    """Upsert digest drafts into Buttondown over a pooled HTTP session."""
+
+    def __init__(
+        self,
+        token: str,
+        base_url: str | None = None,
+        retries: int = 3,
+        timeout: float = 30,
+        session: requests.Session | None = None,
+    ) -> None:
+        self.base_url = (base_url or os.getenv("BUTTONDOWN_API_URL") or API_URL).rstrip("/")
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.update(
+            {
+                "Authorization": f"Token {token}",
+                "Content-Type": "application/json",
+            }
+        )
+        # Only connection failures are retried here; 429s and 5xx responses
+        # must reach the limiter, which backs off and retries them itself.
+        # POST is deliberately not retried: a retried create after a lost
+        # response would produce exactly the duplicate drafts we avoid here.
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            allowed_methods=frozenset({"GET", "PATCH"}),
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=8)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self) -> "ButtondownPublisher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    # ── API helpers ──────────────────────────────────────────────────
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        # PATCH sends the whole draft, so repeating it after a 5xx is safe.
+        return request(
+            "buttondown",
+            method,
+            url,
+            session=self.session,
+            timeout=self.timeout,
+            idempotent=method != "POST",
+            **kwargs,
+        )
+
+    def list_drafts(self) -> List[Dict]:
+        """Return all draft emails, following Buttondown's ``next`` links."""
+
+        drafts: List[Dict] = []
+        url: Optional[str] = f"{self.base_url}/emails"
+        params: Optional[Dict[str, str]] = {"status": "draft"}
+        while url:
+            resp = self._send("GET", url, params=params)
+            resp.raise_for_status()
+            data = resp.json()
+            drafts.extend(data.get("results", []))
+            url = data.get("next")
+            params = None  # ``next`` already carries the query string
+        return drafts
+
+    def find_draft(self, subject: str, drafts: Iterable[Dict] | None = None) -> Optional[Dict]:
+        """Return the existing draft whose subject matches ``subject``."""
+
+        for email in self.list_drafts() if drafts is None else drafts:
+            if email.get("subject", "").strip() == subject.strip():
+                return email
+        return None
+
+    # ── Publishing ───────────────────────────────────────────────────
+
+    def publish(self, subject: str, body: str, drafts: Iterable[Dict] | None = None) -> PublishResult:
+        """Create or update the draft for ``subject``.
+
+        The request is skipped when the remote draft already has identical
+        content.  ``drafts`` may be passed to reuse a single listing across
+        several editions.
+        """
+
+        sha = content_hash(subject, body)
+        existing = self.find_draft(subject, drafts)
+        payload = {"subject": subject, "body": body, "status": "draft"}
+
+        if existing is None:
+            resp = self._send("POST", f"{self.base_url}/emails", json=payload)
+            resp.raise_for_status()
+            return PublishResult(subject, "created", str(resp.json().get("id", "")), sha)
+
+        email_id = str(existing["id"])
+        if content_hash(existing.get("subject", ""), existing.get("body", "")) == sha:
+            return PublishResult(subject, "unchanged", email_id, sha)
+
+        resp = self._send("PATCH", f"{self.base_url}/emails/{email_id}", json=payload)
+        resp.raise_for_status()
+        return PublishResult(subject, "updated", email_id, sha)
+
+    def publish_many(self, editions: Iterable[tuple[str, str]]) -> List[PublishResult]:
+        """Publish several ``(subject, body)`` editions with one draft listing."""
+
+        drafts = self.list_drafts()
+        results = []
+        for subject, body in editions:
+            result = self.publish(subject, body, drafts)
+            # Keep the listing current so a later edition with the same
+            # subject updates this draft instead of creating a duplicate.
+            existing = self.find_draft(subject, drafts)
+            if existing is None:
+                drafts.append({"id": result.email_id, "subject": subject, "body": body})
+            else:
+                existing["body"] = body
+            results.append(result)
+        return results
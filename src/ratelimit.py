@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""Shared per-provider rate limiting and circuit breaking.
+
+Every external provider (Readwise, OpenAI, ElevenLabs, Transistor,
+HuggingFace, Buttondown) gets one process-wide :class:`ProviderLimiter`:
+
+* a token bucket whose rate adapts to ``Retry-After`` and rate-limit headers
+  (halved on 429, recovering gradually on success);
+* a circuit breaker that, after repeated 5xx or transport failures, fails
+  fast with :class:`CircuitOpenError` until a single probe call succeeds.
+
+:meth:`ProviderLimiter.call` retries 429s, and 5xx responses of idempotent
+calls, a bounded number of times after waiting out the computed backoff.
+Limiters are thread-safe and usable from async code (:meth:`acquire_async`,
+:meth:`call_async`).  :func:`request` wraps a ``requests`` call with all of
+this and a default timeout; :func:`snapshot` reports throughput and backoff
+state.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping
+
+import requests
+
+__all__ = [
+    "CircuitOpenError",
+    "ProviderLimiter",
+    "ProviderStats",
+    "limiter",
+    "request",
+    "snapshot",
+]
+
+DEFAULT_TIMEOUT = 30
+OPENAI_TIMEOUT = 120  # chat completions are slow; still never wait forever
+MAX_RETRIES = 3
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# name -> (requests per second, burst)
+PROVIDERS: Dict[str, tuple[float, int]] = {
+    "readwise": (20 / 60, 3),  # Reader list endpoint: 20 requests/minute
+    "openai": (1.0, 4),
+    "elevenlabs": (2.0, 2),
+    "transistor": (1.0, 2),
+    "huggingface": (1.0, 2),
+    "buttondown": (5.0, 5),
+}
+DEFAULT_RATE = (1.0, 2)
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, provider: str, retry_in: float) -> None:
+        super().__init__(f"{provider} circuit open; retry in {retry_in:.1f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+@dataclass
+class ProviderStats:
+    """Point-in-time view of one provider's limiter."""
+
+    name: str
+    state: str  # "closed", "open" or "half-open"
+    rate: float  # current allowed requests per second
+    base_rate: float
+    throughput: float  # completed requests per second over the last minute
+    backoff: float  # seconds until requests are allowed again
+    failures: int  # consecutive failures counted by the breaker
+    requests: int
+    throttled: int  # 429 responses seen
+
+
+def _seconds(value: str | None) -> float | None:
+    """Parse a Retry-After / reset header into seconds from now."""
+
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        number = float(value)
+    except ValueError:
+        pass
+    else:
+        # Large values are epoch timestamps (X-RateLimit-Reset), not deltas.
+        return max(0.0, number - time.time()) if number > 1e9 else max(0.0, number)
+    parts = _DURATION.findall(value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        return sum(float(n) * _UNIT_SECONDS[u] for n, u in parts)  # OpenAI "6m0s"
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _header(headers: Mapping[str, str], *names: str) -> str | None:
+    lowered = {k.lower(): v for k, v in headers.items()}
+    for name in names:
+        if name in lowered:
+            return lowered[name]
+    return None
+
+
+class ProviderLimiter:
+    """Adaptive token bucket plus circuit breaker for one provider."""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int = 1,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        min_rate: float | None = None,
+        max_retries: int = MAX_RETRIES,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Any] = time.sleep,
+    ) -> None:
+        self.name = name
+        self.base_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate or rate / 16
+        self.burst = burst
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_retries = max_retries
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._backoff_until = 0.0
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._completed: deque[float] = deque()
+        self._requests = 0
+        self._throttled = 0
+
+    # ── Admission ────────────────────────────────────────────────────
+
+    def _reserve(self) -> float:
+        """Take a token; return how long the caller must wait before using it."""
+
+        with self._lock:
+            now = self._clock()
+            if self._opened_at is not None:
+                retry_in = self._opened_at + self.reset_timeout - now
+                if retry_in > 0 or self._probing:
+                    raise CircuitOpenError(self.name, max(retry_in, 0.0))
+                self._probing = True  # half-open: let exactly one call through
+
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1  # may go negative: later callers queue behind us
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._backoff_until - now)
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+
+        wait = self._reserve()
+        if wait > 0:
+            self._sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Async counterpart of :meth:`acquire`."""
+
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    # ── Feedback ─────────────────────────────────────────────────────
+
+    def record(
+        self,
+        status: int | None = None,
+        headers: Mapping[str, str] | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        """Feed back the outcome of a call admitted by :meth:`acquire`."""
+
+        headers = headers or {}
+        with self._lock:
+            now = self._clock()
+            self._requests += 1
+            self._completed.append(now)
+            while self._completed and self._completed[0] < now - 60:
+                self._completed.popleft()
+
+            # 5xx and transport errors mean the provider is unhealthy; other
+            # 4xx responses mean it is alive and only count as successes here.
+            failed = (status or 0) >= 500 or (status is None and error is not None)
+            delay = _seconds(_header(headers, "retry-after"))
+            if status == 429:
+                self._throttled += 1
+                self.rate = max(self.min_rate, self.rate / 2)
+                delay = delay if delay is not None else 1 / self.rate
+            elif failed:
+                self._failures += 1
+                if self._probing or self._failures >= self.failure_threshold:
+                    self._opened_at = now
+                # Exponential backoff so retries do not hammer a sick provider.
+                delay = delay if delay is not None else min(30.0, 0.5 * 2 ** (self._failures - 1))
+            else:
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 10)
+                self._failures = 0
+                self._opened_at = None
+            self._probing = False
+
+            remaining = _header(
+                headers, "x-ratelimit-remaining", "ratelimit-remaining", "x-ratelimit-remaining-requests"
+            )
+            reset = _seconds(_header(headers, "x-ratelimit-reset", "ratelimit-reset", "x-ratelimit-reset-requests"))
+            if remaining is not None and reset:
+                try:
+                    left = float(remaining)
+                except ValueError:
+                    left = None
+                if left is not None:
+                    # Never outpace the quota left in the current window.
+                    self.rate = min(self.rate, max(self.min_rate, left / reset))
+                    if left <= 0:
+                        delay = max(delay or 0.0, reset)
+
+            if delay:
+                self._backoff_until = max(self._backoff_until, now + delay)
+                self._tokens = min(self._tokens, 0.0)
+
+    def call(
+        self, fn: Callable[..., Any], *args, idempotent: bool = True, retries: int | None = None, **kwargs
+    ) -> Any:
+        """Run ``fn`` under the limiter, recording its response or exception.
+
+        429s are retried up to ``retries`` (default :attr:`max_retries`)
+        times, as are 5xx responses when ``idempotent``; each retry waits out
+        the backoff recorded for the failed attempt and passes the circuit
+        breaker again.
+        """
+
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            last = attempt == retries
+            self.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                status, headers = _from_exception(exc)
+                self.record(status, headers, error=exc)
+                if last or not _retryable(status, idempotent):
+                    raise
+                continue
+            status, headers = _from_result(result)
+            self.record(status, headers)
+            if last or not _retryable(status, idempotent):
+                return result
+            _discard(result)
+
+    async def call_async(
+        self, fn: Callable[..., Any], *args, idempotent: bool = True, retries: int | None = None, **kwargs
+    ) -> Any:
+        """Await ``fn(*args, **kwargs)`` under the limiter, retrying like :meth:`call`."""
+
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            last = attempt == retries
+            await self.acquire_async()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as exc:
+                status, headers = _from_exception(exc)
+                self.record(status, headers, error=exc)
+                if last or not _retryable(status, idempotent):
+                    raise
+                continue
+            status, headers = _from_result(result)
+            self.record(status, headers)
+            if last or not _retryable(status, idempotent):
+                return result
+            _discard(result)
+
+    # ── Introspection ────────────────────────────────────────────────
+
+    def stats(self) -> ProviderStats:
+        with self._lock:
+            now = self._clock()
+            if self._opened_at is None:
+                state = "closed"
+            elif self._probing or now >= self._opened_at + self.reset_timeout:
+                state = "half-open"
+            else:
+                state = "open"
+            recent = [t for t in self._completed if t >= now - 60]
+            return ProviderStats(
+                name=self.name,
+                state=state,
+                rate=self.rate,
+                base_rate=self.base_rate,
+                throughput=len(recent) / 60,
+                backoff=max(0.0, self._backoff_until - now),
+                failures=self._failures,
+                requests=self._requests,
+                throttled=self._throttled,
+            )
+
+
+def _from_result(result: Any) -> tuple[int | None, Mapping[str, str] | None]:
+    return getattr(result, "status_code", None), getattr(result, "headers", None)
+
+
+def _from_exception(exc: BaseException) -> tuple[int | None, Mapping[str, str] | None]:
+    # requests.HTTPError and openai>=1 APIStatusError both carry ``response``.
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    headers = getattr(response, "headers", None)
+    return status, headers
+
+
+def _retryable(status: int | None, idempotent: bool) -> bool:
+    # A 429 was rejected before any work was done, so it is always safe to
+    # resend; a 5xx may have been applied already.
+    return status == 429 or (idempotent and (status or 0) >= 500)
+
+
+def _upload_streams(kwargs: Mapping[str, Any]) -> list | None:
+    """Return the file objects a ``requests`` call will read its body from.
+
+    Returns ``None`` when the body is a stream that cannot be rewound, so a
+    retry would send it truncated.
+    """
+
+    files = kwargs.get("files") or {}
+    parts = list(files.values() if isinstance(files, Mapping) else (v for _, v in files))
+    contents = [p[1] if isinstance(p, (tuple, list)) else p for p in parts]
+    data = kwargs.get("data")
+    if data is not None and not isinstance(data, (str, bytes, bytearray, Mapping, list, tuple)):
+        contents.append(data)  # file object, generator or other iterable body
+
+    streams = [c for c in contents if not isinstance(c, (str, bytes, bytearray))]
+    for stream in streams:
+        seekable = getattr(stream, "seekable", None)
+        if not hasattr(stream, "seek") or not hasattr(stream, "tell") or (seekable and not seekable()):
+            return None
+    return streams
+
+
+def _discard(result: Any) -> None:
+    close = getattr(result, "close", None)
+    if callable(close):
+        close()  # release the pooled connection before retrying
+
+
+# ── Registry ──────────────────────────────────────────────────────────
+
+_registry: Dict[str, ProviderLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def limiter(name: str) -> ProviderLimiter:
+    """Return the process-wide limiter for provider ``name``."""
+
+    with _registry_lock:
+        if name not in _registry:
+            rate, burst = PROVIDERS.get(name, DEFAULT_RATE)
+            _registry[name] = ProviderLimiter(name, rate, burst)
+        return _registry[name]
+
+
+def snapshot() -> Dict[str, ProviderStats]:
+    """Return current stats for every provider used so far."""
+
+    with _registry_lock:
+        limiters = list(_registry.values())
+    return {lim.name: lim.stats() for lim in limiters}
+
+
+def request(
+    provider: str,
+    method: str,
+    url: str,
+    session: requests.Session | None = None,
+    idempotent: bool | None = None,
+    **kwargs,
+) -> requests.Response:
+    """Send an HTTP request through ``provider``'s limiter.
+
+    429s are retried for every method; 5xx responses only for
+    :data:`IDEMPOTENT_METHODS` unless ``idempotent`` says otherwise.  File
+    uploads in ``files``/``data`` are rewound before each retry, and a body
+    streamed from a source that cannot be rewound is never retried.  The final
+    response is returned as-is (call ``raise_for_status`` as usual); a
+    ``timeout`` of :data:`DEFAULT_TIMEOUT` seconds is applied unless given.
+    """
+
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+    http = session or requests
+    streams = _upload_streams(kwargs)
+    if streams is None:
+        return limiter(provider).call(http.request, method, url, idempotent=idempotent, retries=0, **kwargs)
+
+    # Uploads are read to the end by each attempt; rewind them for retries.
+    start = [(stream, stream.tell()) for stream in streams]
+
+    def send(*args, **kw) -> requests.Response:
+        for stream, pos in start:
+            stream.seek(pos)
+        return http.request(*args, **kw)
+
+    return limiter(provider).call(send, method, url, idempotent=idempotent, **kwargs)
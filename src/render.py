@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Parse a Disguised-SNAP digest once and emit every output format from it.
+
+:func:`parse` turns digest markdown into a small AST (front-matter, preamble
+and ``# `` sections with their bullets and links).  Emitters for PDF input,
+email body, social text and podcast prompt all work from that AST, and
+:class:`Renderer` caches each emitted section by its content hash so editing
+one section only re-renders that section.  :meth:`Renderer.changed` and
+:meth:`Renderer.mark` let the expensive consumers (Pandoc, OpenAI) skip work
+when their input is unchanged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import yaml
+
+__all__ = [
+    "Digest",
+    "EMITTERS",
+    "Renderer",
+    "Section",
+    "parse",
+    "shared_renderer",
+    "template_sections",
+]
+
+ROOT = Path(__file__).resolve().parents[1]
+TEMPLATE = ROOT / "templates" / "digest_template.md"
+CACHE_FILE = Path("outputs/.render_cache.json")  # shared by src/ and scripts/
+MAX_FRAGMENTS = 2000
+
+_FRONT_MATTER = re.compile(r"\A---\n(.*?)\n---\n", re.DOTALL)
+_BULLET = re.compile(r"^\s*[-*]\s+(.*)$")
+_LINK = re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)")
+_LEADING_EMOJI = re.compile(r"^[^\w\[\"'(]+")
+_HEADING = re.compile(r"^\s*#{1,6}\s+")
+_EMPHASIS = re.compile(r"\*\*|__|`")
+
+
+# ── AST ───────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class Section:
+    """One top-level ``# `` section of a digest."""
+
+    title: str
+    body: Tuple[str, ...] = ()
+
+    @property
+    def bullets(self) -> List[str]:
+        return [m.group(1).strip() for m in map(_BULLET.match, self.body) if m]
+
+    @property
+    def links(self) -> List[Tuple[str, str]]:
+        return [m.groups() for line in self.body for m in _LINK.finditer(line)]
+
+    @property
+    def hash(self) -> str:
+        data = "\n".join((self.title, *self.body))
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class Digest:
+    """A parsed digest: front-matter, text before the first section, sections.
+
+    ``raw_front_matter`` is the block exactly as written, so emitters can pass
+    it through without a lossy round trip.
+    """
+
+    front_matter: Dict[str, Any]
+    preamble: Tuple[str, ...]
+    sections: Tuple[Section, ...]
+    raw_front_matter: str = ""
+
+
+def _trim(lines: List[str]) -> Tuple[str, ...]:
+    while lines and not lines[-1].strip():
+        lines.pop()
+    while lines and not lines[0].strip():
+        lines.pop(0)
+    return tuple(lines)
+
+
+def parse(md: str) -> Digest:
+    """Parse digest markdown into a :class:`Digest`."""
+
+    text = md.replace("\r\n", "\n")
+    front: Dict[str, Any] = {}
+    raw = ""
+    match = _FRONT_MATTER.match(text)
+    if match:
+        raw = match.group(1)
+        try:
+            # BaseLoader keeps scalars as written ("2024-06-07" stays a string).
+            loaded = yaml.load(raw, Loader=yaml.BaseLoader)
+        except yaml.YAMLError:
+            loaded = None
+        front = loaded if isinstance(loaded, dict) else {}
+        text = text[match.end():]
+
+    preamble: List[str] = []
+    sections: List[Section] = []
+    title, body = None, []
+    for line in text.splitlines():
+        if line.startswith("# "):
+            if title is None:
+                preamble = body
+            else:
+                sections.append(Section(title, _trim(body)))
+            title, body = line[2:].strip(), []
+        else:
+            body.append(line.rstrip())
+    if title is None:
+        preamble = body
+    else:
+        sections.append(Section(title, _trim(body)))
+    return Digest(front, _trim(preamble), tuple(sections), raw)
+
+
+def template_sections(path: Path = TEMPLATE) -> List[str]:
+    """Return the section titles defined by ``templates/digest_template.md``."""
+
+    return [s.title for s in parse(path.read_text(encoding="utf-8")).sections]
+
+
+# ── Emitters ──────────────────────────────────────────────────────────
+
+
+def _markdown(section: Section) -> str:
+    heading = (f"# {section.title}",) if section.title else ()
+    return "\n".join((*heading, *section.body)).rstrip()
+
+
+def _plain(line: str, urls: bool) -> str:
+    """Strip markdown formatting from one line, keeping its text."""
+
+    line = _HEADING.sub("", line)
+    line = _LINK.sub(r"\1 (\2)" if urls else r"\1", line)
+    return _EMPHASIS.sub("", line).strip()
+
+
+def _social(section: Section) -> str:
+    lines = [section.title] if section.title else []
+    for line in section.body:
+        bullet = _BULLET.match(line)
+        text = _plain(bullet.group(1) if bullet else line, urls=True)
+        if text:
+            lines.append(f"• {text}" if bullet else text)
+        elif lines and lines[-1]:
+            lines.append("")  # keep paragraph breaks, collapsed
+    return "\n".join(lines).rstrip()
+
+
+def _podcast(section: Section) -> str:
+    # Spoken form: drop emoji markers and URLs, keep link anchors and prose.
+    spoken = []
+    for line in section.body:
+        bullet = _BULLET.match(line)
+        text = _LEADING_EMOJI.sub("", _plain(bullet.group(1) if bullet else line, urls=False))
+        if text:
+            spoken.append(text)
+    prefix = f"{section.title}: " if section.title else ""
+    return prefix + " ".join(spoken)
+
+
+def _pdf_document(digest: Digest, parts: List[str]) -> str:
+    front = f"---\n{digest.raw_front_matter}\n---\n\n" if digest.raw_front_matter.strip() else ""
+    return front + "\n\n".join(parts) + "\n"
+
+
+def _email_document(digest: Digest, parts: List[str]) -> str:
+    return "\n\n".join(parts) + "\n"
+
+
+def _social_document(digest: Digest, parts: List[str]) -> str:
+    return "\n\n".join(parts) + "\n"
+
+
+def _podcast_document(digest: Digest, parts: List[str]) -> str:
+    return "\n".join(parts) + "\n"
+
+
+# name -> (per-section emitter, document assembler)
+EMITTERS: Dict[str, Tuple[Callable[[Section], str], Callable[[Digest, List[str]], str]]] = {
+    "pdf": (_markdown, _pdf_document),
+    "email": (_markdown, _email_document),
+    "social": (_social, _social_document),
+    "podcast": (_podcast, _podcast_document),
+}
+
+
+# ── Renderer ──────────────────────────────────────────────────────────
+
+
+class Renderer:
+    """Render digests through :data:`EMITTERS` with a per-section cache.
+
+    With ``cache_path`` the fragment cache and the hash of each named output
+    persist between runs as JSON.
+    """
+
+    def __init__(self, cache_path: Path | None = None) -> None:
+        self.cache_path = cache_path
+        self.fragments: Dict[str, str] = {}
+        self.outputs: Dict[str, str] = {}
+        self._parsed: Dict[str, Digest] = {}
+        self.rendered = 0  # sections actually emitted (cache misses)
+        if cache_path and cache_path.exists():
+            data = json.loads(cache_path.read_text(encoding="utf-8"))
+            self.fragments = data.get("fragments", {})
+            self.outputs = data.get("outputs", {})
+
+    def load(self, md_path: Path) -> Digest:
+        """Parse ``md_path``, reusing the AST while its content is unchanged."""
+
+        md = md_path.read_text(encoding="utf-8")
+        sha = hashlib.sha256(md.encode("utf-8")).hexdigest()
+        if sha not in self._parsed:
+            self._parsed[sha] = parse(md)
+        return self._parsed[sha]
+
+    def render(self, digest: Digest, emitter: str) -> str:
+        """Return ``digest`` emitted as ``emitter`` (see :data:`EMITTERS`)."""
+
+        emit_section, assemble = EMITTERS[emitter]
+        # Text before the first section is rendered as an untitled section.
+        sections = digest.sections
+        if digest.preamble:
+            sections = (Section("", digest.preamble), *sections)
+        parts = []
+        for section in sections:
+            key = f"{emitter}:{section.hash}"
+            if key in self.fragments:
+                self.fragments[key] = self.fragments.pop(key)  # mark as recent
+            else:
+                self.fragments[key] = emit_section(section)
+                self.rendered += 1
+            parts.append(self.fragments[key])
+        return assemble(digest, parts)
+
+    def changed(self, name: str, output: str) -> bool:
+        """Return ``True`` unless ``output`` matches what :meth:`mark` recorded."""
+
+        return self.outputs.get(name) != hashlib.sha256(output.encode("utf-8")).hexdigest()
+
+    def mark(self, name: str, output: str) -> None:
+        """Record ``output`` as the input that produced the named artefact."""
+
+        self.outputs[name] = hashlib.sha256(output.encode("utf-8")).hexdigest()
+
+    def save(self) -> None:
+        if not self.cache_path:
+            return
+        # Keep only the most recent fragments; dicts preserve insertion order.
+        fragments = dict(list(self.fragments.items())[-MAX_FRAGMENTS:])
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_path.write_text(
+            json.dumps({"fragments": fragments, "outputs": self.outputs}, indent=1, ensure_ascii=False),
+            encoding="utf-8",
+        )
+
+
+@lru_cache(maxsize=None)
+def shared_renderer(cache_path: Path = CACHE_FILE) -> Renderer:
+    """Return the process-wide :class:`Renderer` persisted at ``cache_path``."""
+
+    return Renderer(cache_path)
@@ -2,8 +2,10 @@
 """Utilities for rendering and linting Disguised-SNAP digests.
 
 The ``render_pdf`` module converts ``output/digest_output.md`` to ``output/digest.pdf``
-via Pandoc and XeLaTeX.  It also exposes :func:`lint_snap` used by tests to
-validate basic structural rules of the markdown.
+via Pandoc and XeLaTeX, feeding Pandoc the PDF emitter output of the shared
+digest AST and skipping the conversion when that input is unchanged.  It also
+exposes :func:`lint_snap` used by tests to validate basic structural rules of
+the markdown.
 """
 
 from __future__ import annotations
@@ -11,20 +13,27 @@ from __future__ import annotations
 import subprocess
 from pathlib import Path
 
+try:
+    from .render import parse, shared_renderer, template_sections
+except ImportError:  # executed as ``python src/render_pdf.py``
+    from render import parse, shared_renderer, template_sections
+
 __all__ = ["lint_snap"]
 
 
 def lint_snap(md: str) -> None:
     """Validate Disguised-SNAP markdown structure.
 
-    The style guide requires exactly nine top-level headings.  If the document
-    contains a different number of headings, a ``ValueError`` is raised.
+    The style guide requires exactly as many top-level headings as
+    ``templates/digest_template.md`` defines (nine).  If the document contains
+    a different number of headings, a ``ValueError`` is raised.
     """
 
-    headings = [line for line in md.splitlines() if line.startswith("# ")]
-    if len(headings) != 9:
+    expected = len(template_sections())
+    found = len(parse(md).sections)
+    if found != expected:
         raise ValueError(
-            f"Document must contain exactly 9 top-level headings (found {len(headings)})"
+            f"Document must contain exactly {expected} top-level headings (found {found})"
         )
 
 
@@ -36,17 +45,27 @@ pdf_out.parent.mkdir(exist_ok=True, parents=True)
 def render_pdf() -> None:
     """Convert the generated markdown digest into a PDF using Pandoc."""
 
+    renderer = shared_renderer()
+    source = renderer.render(renderer.load(md_in), "pdf")
+    if not renderer.changed(f"{md_in}:pdf", source) and pdf_out.exists():
+        print(f"✔  {pdf_out} is up to date")
+        return
+
     print(f"→ Rendering {md_in} → {pdf_out}")
     subprocess.run(
         [
             "pandoc",
-            str(md_in),
+            "--from=markdown",
             "--pdf-engine=xelatex",
             "-o",
             str(pdf_out),
         ],
+        input=source,
+        text=True,
         check=True,
     )
+    renderer.mark(f"{md_in}:pdf", source)
+    renderer.save()
     print(f"✔  PDF written to {pdf_out}")
 
 
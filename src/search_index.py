@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Full-text index over past digests and their generated outputs.
+
+Sections, bullets, links and social snippets of every digest are stored in a
+SQLite table with an external-content FTS5 index at
+``metadata/search_index.sqlite``.  Indexing is
+incremental: a digest is only re-indexed when the SHA-256 of its markdown and
+social JSON, or its date, changes, and ``--rebuild`` drops digests whose file
+is gone.  ``scripts/update_metadata.py`` indexes each
+new digest, and :meth:`SearchIndex.previously_covered` gives the generation
+stage cheap "previously covered" context.
+
+Usage:
+  python src/search_index.py QUERY          # search
+  python src/search_index.py --rebuild      # index digests/ + outputs/social/
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+try:
+    from .render import Section, parse
+except ImportError:  # executed as ``python src/search_index.py``
+    from render import Section, parse
+
+__all__ = ["Hit", "SearchIndex"]
+
+INDEX_FILE = Path("metadata/search_index.sqlite")
+DIGEST_DIR = Path("digests")
+SOCIAL_DIR = Path("outputs/social")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    stem   TEXT PRIMARY KEY,
+    date   TEXT,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id      INTEGER PRIMARY KEY,
+    stem    TEXT NOT NULL,
+    date    TEXT,
+    kind    TEXT NOT NULL,
+    section TEXT,
+    content TEXT,
+    url     TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_stem ON entries (stem);
+-- External-content FTS table: the text is stored once, in ``entries``.
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    section,
+    content,
+    content = 'entries',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, section, content)
+    VALUES (new.id, new.section, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, section, content)
+    VALUES ('delete', old.id, old.section, old.content);
+END;
+"""
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "about after also been being from have into more over said that their them "
+    "then there these they this those through under were what when which while "
+    "will with would your section".split()
+)
+
+
+@dataclass
+class Hit:
+    """One search result."""
+
+    stem: str
+    date: str
+    kind: str  # "section", "bullet", "link" or "social"
+    section: str
+    content: str
+    url: str
+    snippet: str
+    score: float
+
+
+def _digest_date(stem: str) -> str:
+    match = re.match(r"(\d{4})(\d{2})(\d{2})", stem)
+    return "-".join(match.groups()) if match else ""
+
+
+def _entries(md: str, social: dict | None) -> Iterator[Tuple[str, str, str, str]]:
+    """Yield ``(kind, section, content, url)`` rows for one digest."""
+
+    digest = parse(md)
+    # Text before the first ``# `` heading (e.g. ``##``-only digests) is an
+    # untitled section, as in Renderer.render.
+    sections = digest.sections
+    if digest.preamble:
+        sections = (Section("", digest.preamble), *sections)
+    for section in sections:
+        yield "section", section.title, "\n".join(section.body), ""
+        for bullet in section.bullets:
+            yield "bullet", section.title, bullet, ""
+        for text, url in section.links:
+            yield "link", section.title, text, url
+    for key, value in (social or {}).items():
+        for text in value if isinstance(value, list) else [value]:
+            yield "social", key, str(text), ""
+
+
+def _match_expr(text: str, operator: str) -> str:
+    """Quote every word of ``text`` so user input is never FTS5 syntax."""
+
+    return f" {operator} ".join(f'"{w}"' for w in _WORD.findall(text))
+
+
+class SearchIndex:
+    """Incrementally maintained FTS5 index of digests."""
+
+    def __init__(self, path: Path = INDEX_FILE) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "SearchIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # ── Indexing ─────────────────────────────────────────────────────
+
+    def index_digest(self, md_path: Path, social_path: Path | None = None, date: str | None = None) -> bool:
+        """Index one digest (and its social JSON); return ``False`` if unchanged."""
+
+        with self.conn:
+            return self._index(md_path, social_path, date)
+
+    def _index(self, md_path: Path, social_path: Path | None, date: str | None) -> bool:
+        md = md_path.read_text(encoding="utf-8")
+        social_raw = social_path.read_text(encoding="utf-8") if social_path and social_path.exists() else ""
+        sha = hashlib.sha256((md + "\0" + social_raw).encode("utf-8")).hexdigest()
+
+        stem = md_path.stem
+        date = date or _digest_date(stem) or parse(md).front_matter.get("date", "")
+        row = self.conn.execute("SELECT sha256, date FROM digests WHERE stem = ?", (stem,)).fetchone()
+        if row and row == (sha, date):
+            return False
+
+        try:
+            social = json.loads(social_raw) if social_raw else None
+        except json.JSONDecodeError:
+            social = None
+        if not isinstance(social, dict):
+            social = None
+
+        self.conn.execute("DELETE FROM entries WHERE stem = ?", (stem,))
+        self.conn.executemany(
+            "INSERT INTO entries (stem, date, kind, section, content, url) VALUES (?, ?, ?, ?, ?, ?)",
+            ((stem, date, *entry) for entry in _entries(md, social)),
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO digests (stem, date, sha256) VALUES (?, ?, ?)",
+            (stem, date, sha),
+        )
+        return True
+
+    def rebuild(self, digest_dir: Path = DIGEST_DIR, social_dir: Path = SOCIAL_DIR) -> int:
+        """Index every digest in ``digest_dir`` and drop digests no longer there.
+
+        Returns how many digests were added, changed or removed.
+        """
+
+        changed = 0
+        with self.conn:  # one transaction for the whole sweep
+            paths = sorted(digest_dir.glob("*.md"))
+            for md_path in paths:
+                changed += self._index(md_path, social_dir / f"{md_path.stem}.json", None)
+            present = {p.stem for p in paths}
+            gone = [stem for (stem,) in self.conn.execute("SELECT stem FROM digests") if stem not in present]
+            for stem in gone:
+                self.conn.execute("DELETE FROM entries WHERE stem = ?", (stem,))
+                self.conn.execute("DELETE FROM digests WHERE stem = ?", (stem,))
+        return changed + len(gone)
+
+    # ── Queries ──────────────────────────────────────────────────────
+
+    def search(self, query: str, limit: int = 20, kind: str | None = None, exclude: str | None = None) -> List[Hit]:
+        """Return entries matching every word of ``query``, best first."""
+
+        return self._query(_match_expr(query, "AND"), limit, kind, exclude)
+
+    def previously_covered(self, text: str, limit: int = 5, exclude: str | None = None) -> List[Hit]:
+        """Return past sections sharing the most salient keywords of ``text``."""
+
+        counts = Counter(
+            w.lower() for w in _WORD.findall(text) if len(w) > 3 and w.lower() not in _STOPWORDS
+        )
+        keywords = " ".join(w for w, _ in counts.most_common(12))
+        return self._query(_match_expr(keywords, "OR"), limit, "section", exclude)
+
+    def _query(self, expr: str, limit: int, kind: str | None, exclude: str | None) -> List[Hit]:
+        if not expr:
+            return []
+        sql = (
+            "SELECT e.stem, e.date, e.kind, e.section, e.content, e.url,"
+            " snippet(entries_fts, 1, '[', ']', '…', 12), bm25(entries_fts)"
+            " FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid"
+            " WHERE entries_fts MATCH ?"
+        )
+        params: list = [expr]
+        if kind:
+            sql += " AND e.kind = ?"
+            params.append(kind)
+        if exclude:
+            sql += " AND e.stem != ?"
+            params.append(exclude)
+        sql += " ORDER BY bm25(entries_fts) LIMIT ?"
+        params.append(limit)
+        return [Hit(*row) for row in self.conn.execute(sql, params)]
+
+
+def main(argv: List[str]) -> None:
+    if not argv:
+        sys.exit("Usage: search_index.py QUERY | --rebuild")
+    with SearchIndex() as index:
+        if argv[0] == "--rebuild":
+            print(f"✔ Indexed {index.rebuild()} changed digests into {index.path}")
+            return
+        for hit in index.search(" ".join(argv)):
+            print(f"{hit.date}  {hit.stem}  [{hit.kind}] {hit.section}: {hit.snippet}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
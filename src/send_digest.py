@@ -1,19 +1,23 @@
 #!/usr/bin/env python3
 """
-Create a Buttondown **draft** email from the Disguised-SNAP markdown digest.
-Removes any top-level headings and prepends YAML frontmatter:
+Create or update the Buttondown **draft** email for today's digest.
+Replaces any existing front-matter with canonical YAML frontmatter (every
+``# `` section heading is kept):
   - title
   - date
   - author
-Retains full body. Logs status and response.
+  - license
+Re-running for the same day PATCHes the existing draft instead of creating
+a duplicate, and sends nothing when the content is unchanged.
 """
 
 import os
 import sys
-import requests
 from datetime import datetime
 from pathlib import Path
 
+from publisher import ButtondownPublisher, build_body, digest_subject
+
 # ─── Config ─────────────────────────────────────────────────────────────
 BUTTONDOWN_TOKEN = os.getenv("BUTTONDOWN_TOKEN")
 if not BUTTONDOWN_TOKEN:
@@ -31,50 +35,15 @@ else:
     sys.exit("❌ digest_output.md not found in output/ or repo root")
 
 raw = md_file.read_text(encoding="utf-8")
-# Strip any top-level headings and blank lines
-lines = raw.splitlines()
-body_lines = []
-header_skipped = False
-for line in lines:
-    if not header_skipped:
-        if line.startswith("# ") or not line.strip():
-            continue
-        header_skipped = True
-    body_lines.append(line)
-body_content = "\n".join(body_lines)
 
-# ─── Prepend YAML frontmatter ────────────────────────────────────────────
+# ─── Prepare and upsert draft ────────────────────────────────────────────
 today = datetime.utcnow().strftime("%Y-%m-%d")
-frontmatter = (
-    f"---\n"
-    f"title: \"Ohmbudsman Digest — {today}\"\n"
-    f"date: {today}\n"
-    f"author: Ohmbudsman\n"
-    f"---\n\n"
-)
-body_md = frontmatter + body_content
-
-# ─── Prepare and send payload ────────────────────────────────────────────
-subject = f"Ohmbudsman Digest — {today}"
-payload = {
-    "subject": subject,
-    "body":    body_md,
-    "status":  "draft"
-}
-headers = {
-    "Authorization": f"Token {BUTTONDOWN_TOKEN}",
-    "Content-Type":  "application/json"
-}
+subject = digest_subject(today)
+body_md = build_body(raw, today)
 
-print("→ Sending draft to Buttondown…")
-resp = requests.post(
-    "https://api.buttondown.com/v1/emails",
-    headers=headers,
-    json=payload,
-    timeout=30
-)
+print("→ Upserting draft in Buttondown…")
+with ButtondownPublisher(BUTTONDOWN_TOKEN) as publisher:
+    result = publisher.publish(subject, body_md)
 
-print("← Buttondown status:", resp.status_code)
-print(resp.text)
-resp.raise_for_status()
-print("✔ Draft created successfully.")
+print(f"← Buttondown draft {result.email_id}: {result.action}")
+print("✔ Draft up to date.")
@@ -0,0 +1,82 @@
+import threading
+from datetime import datetime, timezone
+
+from src.editions import Edition, TagIndex, load_editions, shared_category, summarise_editions
+
+NOW = datetime(2024, 6, 7, 12, tzinfo=timezone.utc)
+
+
+def doc(title, tags, category="article", updated="2024-06-07T08:00:00Z"):
+    return {"title": title, "tags": {t: {} for t in tags}, "category": category, "updated_at": updated}
+
+
+def test_load_editions_applies_defaults():
+    editions = load_editions()
+    assert [e.slug for e in editions] == ["daily", "tech", "policy"]
+    assert all(e.categories == ["article"] for e in editions)
+    assert editions[2].lookback_hours == 48
+    assert "Disguised-SNAP" in editions[0].prompt
+
+
+def test_load_editions_literal_prompts(tmp_path):
+    feeds = tmp_path / "feeds.yml"
+    feeds.write_text(
+        "editions:\n"
+        "  - name: AI Watch\n"
+        "    prompt: |\n"
+        "      Summarise in Disguised-SNAP.\n"
+        "      Keep it short.\n"
+        "    tags: [ai]\n"
+        "  - name: Hash\n"
+        "    prompt: \"Focus on #ai news\"\n",
+        encoding="utf-8",
+    )
+    ai, hashed = load_editions(feeds)
+    assert (ai.slug, ai.tags) == ("ai-watch", ["ai"])
+    assert ai.prompt == "Summarise in Disguised-SNAP.\nKeep it short.\n"
+    assert hashed.prompt == "Focus on #ai news"
+
+
+def test_tag_index_routes_by_tag_category_and_lookback():
+    docs = [
+        doc("ai news", ["AI"]),
+        doc("policy", ["policy", "ai"]),
+        doc("ai note", ["ai"], category="note"),
+        doc("stale ai", ["ai"], updated="2024-06-05T00:00:00Z"),
+    ]
+    index = TagIndex(docs)
+    tech = Edition("Tech", "tech", tags=["ai"], categories=["article"])
+    wide = Edition("All", "all", lookback_hours=72)
+
+    assert [d["title"] for d in index.route(tech, NOW)] == ["ai news", "policy"]
+    assert len(index.route(wide, NOW)) == 4
+
+
+def test_summarise_editions_runs_concurrently_and_skips_empty():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake(edition, docs):
+        barrier.wait()  # deadlocks unless both editions run at once
+        return f"{edition.name}:{len(docs)}"
+
+    a, b, c = Edition("A", "a"), Edition("B", "b"), Edition("C", "c")
+    routed = {"a": (a, [{}]), "b": (b, [{}, {}]), "c": (c, [])}
+    assert summarise_editions(routed, summarise=fake) == ({"a": "A:1", "b": "B:2"}, {})
+
+
+def test_summarise_editions_keeps_successes_when_one_fails():
+    def fake(edition, docs):
+        if edition.slug == "b":
+            raise RuntimeError("openai circuit open")
+        return edition.name
+
+    routed = {slug: (Edition(slug.upper(), slug), [{}]) for slug in "abc"}
+    digests, errors = summarise_editions(routed, summarise=fake)
+    assert digests == {"a": "A", "c": "C"}
+    assert list(errors) == ["b"] and str(errors["b"]) == "openai circuit open"
+
+
+def test_shared_category_only_when_every_edition_agrees():
+    assert shared_category(load_editions()) == "article"
+    assert shared_category([Edition("A", "a", categories=["article"]), Edition("B", "b")]) is None
+    assert shared_category([Edition("A", "a", categories=["article", "rss"])]) is None
@@ -0,0 +1,114 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pytest
+import yaml
+
+from src.publisher import ButtondownPublisher, build_body, digest_subject
+
+
+class FakeButtondown(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Buttondown ``/v1/emails`` endpoints."""
+
+    emails: dict = {}
+    calls: list = []
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self):
+        return json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+    def do_GET(self):
+        self.calls.append(("GET", self.path))
+        drafts = [e for e in self.emails.values() if e["status"] == "draft"]
+        self._reply(200, {"results": drafts, "next": None, "count": len(drafts)})
+
+    def do_POST(self):
+        self.calls.append(("POST", self.path))
+        email = {**self._json(), "id": f"em_{len(self.emails) + 1}"}
+        self.emails[email["id"]] = email
+        self._reply(201, email)
+
+    def do_PATCH(self):
+        self.calls.append(("PATCH", self.path))
+        email_id = urlparse(self.path).path.rstrip("/").split("/")[-1]
+        self.emails[email_id].update(self._json())
+        self._reply(200, self.emails[email_id])
+
+
+@pytest.fixture
+def api():
+    FakeButtondown.emails = {}
+    FakeButtondown.calls = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeButtondown)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def test_build_body_replaces_front_matter():
+    md = "---\ntitle: old\n---\n\n# Digest\n\n- 📰 Intro.\n\n# Section 1\n- 📰 Bullet."
+    body = build_body(md, "2024-06-07")
+    assert body.count("---\n") == 2
+    assert 'title: "Ohmbudsman Digest — 2024-06-07"' in body
+    # Every top-level heading is kept, including a leading title heading:
+    # it is rendered as a digest section like any other.
+    assert body.endswith("---\n\n# Digest\n- 📰 Intro.\n\n# Section 1\n- 📰 Bullet.\n")
+    assert build_body(body, "2024-06-07") == body
+
+
+
+def test_build_body_quotes_title_as_yaml():
+    title = digest_subject("2024-06-07", 'AI "Weekly" \\ Notes')
+    front = build_body("# Section 1\n- 📰 Bullet.", "2024-06-07", title=title).split("---\n")[1]
+    assert yaml.safe_load(front)["title"] == title
+
+def test_publish_is_idempotent(api):
+    subject = digest_subject("2024-06-07")
+    with ButtondownPublisher("tok", base_url=api) as pub:
+        first = pub.publish(subject, "- 📰 One.")
+        again = pub.publish(subject, "- 📰 One.")
+        edited = pub.publish(subject, "- 📰 Two.")
+
+    assert (first.action, again.action, edited.action) == ("created", "unchanged", "updated")
+    assert first.email_id == again.email_id == edited.email_id
+    assert len(FakeButtondown.emails) == 1
+    assert FakeButtondown.emails[first.email_id]["body"] == "- 📰 Two."
+    assert [m for m, _ in FakeButtondown.calls].count("PATCH") == 1
+
+
+def test_publish_many_lists_drafts_once(api):
+    editions = [
+        (digest_subject("2024-06-07", "Tech"), "- ⚙️ Tech."),
+        (digest_subject("2024-06-07", "Policy"), "- 🏛️ Policy."),
+    ]
+    with ButtondownPublisher("tok", base_url=api) as pub:
+        results = pub.publish_many(editions)
+        rerun = pub.publish_many(editions)
+
+    assert [r.action for r in results] == ["created", "created"]
+    assert [r.action for r in rerun] == ["unchanged", "unchanged"]
+    assert [m for m, _ in FakeButtondown.calls] == ["GET", "POST", "POST", "GET"]
+
+
+def test_publish_many_reuses_draft_created_in_same_batch(api):
+    subject = digest_subject("2024-06-07", "Tech")
+    with ButtondownPublisher("tok", base_url=api) as pub:
+        results = pub.publish_many([(subject, "- ⚙️ First."), (subject, "- ⚙️ Second.")])
+
+    assert [r.action for r in results] == ["created", "updated"]
+    assert len(FakeButtondown.emails) == 1
+    assert FakeButtondown.emails[results[0].email_id]["body"] == "- ⚙️ Second."
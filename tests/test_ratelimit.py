@@ -0,0 +1,247 @@
+import asyncio
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.ratelimit import CircuitOpenError, ProviderLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make(clock, **kwargs):
+    return ProviderLimiter("test", kwargs.pop("rate", 2.0), clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_token_bucket_spaces_requests_after_burst(clock):
+    lim = make(clock, burst=2)
+    for _ in range(4):
+        lim.acquire()
+    assert clock.slept == [0.5, 0.5]
+
+
+def test_retry_after_backs_off_and_halves_rate(clock):
+    lim = make(clock)
+    lim.acquire()
+    lim.record(429, {"Retry-After": "3"})
+    stats = lim.stats()
+    assert (stats.rate, stats.backoff, stats.throttled) == (1.0, 3.0, 1)
+
+    lim.acquire()
+    assert clock.slept == [3.0]
+    for _ in range(20):
+        lim.record(200)
+    assert lim.stats().rate == 2.0
+
+
+def test_rate_limit_headers_cap_rate(clock):
+    lim = make(clock)
+    lim.record(200, {"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "10"})
+    assert lim.stats().rate == 0.5
+    lim.record(200, {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "1m0s"})
+    assert lim.stats().backoff == 60.0
+
+
+def test_circuit_opens_then_recovers_through_one_probe(clock):
+    lim = make(clock, failure_threshold=2, reset_timeout=10)
+    lim.record(503)
+    lim.record(error=ConnectionError())
+    assert lim.stats().state == "open"
+    with pytest.raises(CircuitOpenError):
+        lim.acquire()
+
+    clock.now += 10
+    lim.acquire()  # the single half-open probe
+    with pytest.raises(CircuitOpenError):
+        lim.acquire()
+    lim.record(200)
+    assert lim.stats().state == "closed"
+    lim.acquire()
+
+
+def test_client_errors_do_not_trip_breaker(clock):
+    lim = make(clock, failure_threshold=1)
+    lim.record(404)
+    assert lim.stats().state == "closed"
+
+
+def test_call_async_records_outcome(clock):
+    lim = make(clock)
+
+    class Response:
+        status_code = 200
+        headers = {"ratelimit-remaining": "1", "ratelimit-reset": "4"}
+
+    async def fetch():
+        return Response()
+
+    assert isinstance(asyncio.run(lim.call_async(fetch)), Response)
+    stats = lim.stats()
+    assert (stats.requests, stats.rate) == (1, 0.25)
+
+
+class FakeResponse:
+    def __init__(self, status, data=None, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.data = data or {}
+        self.closed = False
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, kwargs.get("params")))
+        return self.responses.pop(0)
+
+
+def test_sweep_survives_429_on_second_page(clock, monkeypatch):
+    from src import editions, ratelimit
+
+    monkeypatch.setitem(ratelimit._registry, "readwise", make(clock, rate=1.0, burst=3))
+    throttled = FakeResponse(429, headers={"Retry-After": "7"})
+    session = FakeSession(
+        FakeResponse(200, {"results": [{"id": 1}], "nextPageCursor": "p2"}),
+        throttled,
+        FakeResponse(200, {"results": [{"id": 2}], "nextPageCursor": None}),
+    )
+
+    docs = editions.fetch_reader_docs("token", "2024-01-01T00:00:00Z", session=session, category="article")
+
+    assert [d["id"] for d in docs] == [1, 2]
+    first = {"updatedAfter": "2024-01-01T00:00:00Z", "page_size": 1000, "category": "article"}
+    assert [params for _, params in session.calls] == [
+        first,
+        {**first, "pageCursor": "p2"},
+        {**first, "pageCursor": "p2"},
+    ]
+    assert clock.slept == [7.0] and throttled.closed
+
+
+def test_request_retries_5xx_only_for_idempotent_methods(clock, monkeypatch):
+    from src import ratelimit
+
+    monkeypatch.setitem(ratelimit._registry, "test", make(clock, burst=5))
+    session = FakeSession(FakeResponse(503), FakeResponse(200))
+    assert ratelimit.request("test", "GET", "http://x", session=session).status_code == 200
+
+    session = FakeSession(FakeResponse(503), FakeResponse(200))
+    assert ratelimit.request("test", "POST", "http://x", session=session).status_code == 503
+    assert len(session.calls) == 1
+
+    session = FakeSession(FakeResponse(429), FakeResponse(201))
+    assert ratelimit.request("test", "POST", "http://x", session=session).status_code == 201
+
+
+def test_call_gives_up_after_max_retries(clock):
+    lim = make(clock, max_retries=2)
+    session = FakeSession(*(FakeResponse(429) for _ in range(4)))
+    assert lim.call(session.request, "GET", "http://x").status_code == 429
+    assert len(session.calls) == 3
+
+
+class ThrottleOnce(BaseHTTPRequestHandler):
+    """Answers the first POST with 429, later ones with 200; keeps each body."""
+
+    bodies: list = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.bodies.append(self.rfile.read(int(self.headers["Content-Length"])))
+        self.send_response(429 if len(self.bodies) == 1 else 200)
+        self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+@pytest.fixture
+def throttle_once():
+    ThrottleOnce.bodies = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottleOnce)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/upload"
+    server.shutdown()
+    server.server_close()
+
+
+def test_retried_upload_resends_the_whole_file(clock, monkeypatch, throttle_once):
+    from src import ratelimit
+
+    monkeypatch.setitem(ratelimit._registry, "test", make(clock, burst=5))
+    upload = io.BytesIO(b"x" * 1000)
+    resp = ratelimit.request("test", "POST", throttle_once, files={"file": ("a.zip", upload)})
+
+    assert resp.status_code == 200
+    # Each attempt gets a fresh multipart boundary; the file part must not shrink.
+    first, retried = (body.split(b"\r\n\r\n", 1)[1].split(b"\r\n--")[0] for body in ThrottleOnce.bodies)
+    assert retried == first == b"x" * 1000
+
+
+def test_streamed_body_is_not_retried(clock, monkeypatch, throttle_once):
+    from src import ratelimit
+
+    monkeypatch.setitem(ratelimit._registry, "test", make(clock, burst=5))
+    chunks = iter([b"a" * 10, b"b" * 10])
+    resp = ratelimit.request("test", "POST", throttle_once, data=chunks, headers={"Content-Length": "20"})
+
+    assert resp.status_code == 429
+    assert ThrottleOnce.bodies == [b"a" * 10 + b"b" * 10]
+
+
+class RateLimitError(Exception):
+    """Shaped like ``openai.RateLimitError`` (openai>=1): status and httpx response."""
+
+    status_code = 429
+
+    def __init__(self):
+        super().__init__("Rate limit reached for gpt-4o")
+        self.response = FakeResponse(429, headers={"retry-after": "2", "x-ratelimit-reset-requests": "2s"})
+
+
+def test_openai_rate_limit_error_is_retried_not_a_failure(clock):
+    lim = make(clock, failure_threshold=1)
+    attempts = []
+
+    def create(**kwargs):
+        attempts.append(kwargs)
+        if len(attempts) == 1:
+            raise RateLimitError()
+        return "completion"
+
+    assert lim.call(create, model="gpt-4o", timeout=120) == "completion"
+    assert len(attempts) == 2 and clock.slept == [2.0]
+    stats = lim.stats()
+    assert (stats.state, stats.failures, stats.throttled) == ("closed", 0, 1)
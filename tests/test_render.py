@@ -0,0 +1,96 @@
+from pathlib import Path
+
+from src.render import Renderer, parse, template_sections
+
+ROOT = Path(__file__).resolve().parents[1]
+SAMPLE = (ROOT / "digests" / "20240607_Sample.md").read_text(encoding="utf-8")
+
+MD = "\n".join([
+    "---",
+    "title: \"Ohmbudsman Digest — 2024-06-07\"",
+    "date: 2024-06-07",
+    "---",
+    "",
+    "# Section 1: Headlines",
+    "- 📰 [Tech merger](https://example.com/m). Two giants unite.",
+    "",
+    "# Section 2: Key Insights",
+    "- 💡 AI adoption climbs 30 %.",
+])
+
+
+def test_parse_sections_bullets_and_links():
+    digest = parse(MD)
+    assert digest.front_matter["date"] == "2024-06-07"
+    assert [s.title for s in digest.sections] == ["Section 1: Headlines", "Section 2: Key Insights"]
+    assert digest.sections[0].bullets == ["📰 [Tech merger](https://example.com/m). Two giants unite."]
+    assert digest.sections[0].links == [("Tech merger", "https://example.com/m")]
+
+
+
+def test_front_matter_keeps_nested_values_and_quoting():
+    front = 'title: "Say \\"hi\\""\ndate: 2024-06-07\ntags:\n  - ai\n  - policy'
+    digest = parse(f"---\n{front}\n---\n\n# Section 1\n- 📰 Bullet.")
+    assert digest.front_matter == {"title": 'Say "hi"', "date": "2024-06-07", "tags": ["ai", "policy"]}
+    assert Renderer().render(digest, "pdf").startswith(f"---\n{front}\n---\n\n# Section 1\n")
+
+def test_template_matches_sample_digest():
+    assert template_sections() == [s.title for s in parse(SAMPLE).sections]
+    assert len(template_sections()) == 9
+
+
+def test_emitters_share_one_parse():
+    renderer = Renderer()
+    digest = parse(MD)
+    assert renderer.render(digest, "email").startswith("# Section 1: Headlines\n")
+    assert renderer.render(digest, "pdf").startswith('---\ntitle: "Ohmbudsman Digest — 2024-06-07"')
+    assert "• 📰 Tech merger (https://example.com/m). Two giants unite." in renderer.render(digest, "social")
+    assert renderer.render(digest, "podcast").splitlines()[0] == (
+        "Section 1: Headlines: Tech merger. Two giants unite."
+    )
+
+
+def test_editing_one_section_rerenders_only_that_section(tmp_path):
+    cache = tmp_path / "render_cache.json"
+    renderer = Renderer(cache)
+    for emitter in ("pdf", "email", "social", "podcast"):
+        renderer.render(parse(SAMPLE), emitter)
+    assert renderer.rendered == 4 * 9
+    renderer.save()
+
+    edited = SAMPLE.replace("📈 Market bullet.", "📈 Markets rallied.")
+    warm = Renderer(cache)
+    for emitter in ("pdf", "email", "social", "podcast"):
+        warm.render(parse(edited), emitter)
+    assert warm.rendered == 4
+
+
+def test_changed_tracks_marked_outputs(tmp_path):
+    renderer = Renderer(tmp_path / "render_cache.json")
+    assert renderer.changed("digest:pdf", "a")
+    renderer.mark("digest:pdf", "a")
+    renderer.save()
+    reloaded = Renderer(tmp_path / "render_cache.json")
+    assert not reloaded.changed("digest:pdf", "a")
+    assert reloaded.changed("digest:pdf", "b")
+
+
+def test_social_and_podcast_keep_prose_lines():
+    md = "# Section 9: Outlook\nRegulators move first.\n**Markets** follow [later](https://example.com/o).\n"
+    renderer = Renderer()
+    digest = parse(md)
+    assert renderer.render(digest, "social") == (
+        "Section 9: Outlook\nRegulators move first.\nMarkets follow later (https://example.com/o).\n"
+    )
+    assert renderer.render(digest, "podcast") == (
+        "Section 9: Outlook: Regulators move first. Markets follow later.\n"
+    )
+
+
+def test_subheading_only_digest_is_rendered_from_preamble():
+    digest = parse("## HEADLINE\n- 📰 Grid storage surges.\n\n## TAKEAWAY\nBatteries win.\n")
+    assert digest.sections == ()
+    renderer = Renderer()
+    assert renderer.render(digest, "social") == "HEADLINE\n• 📰 Grid storage surges.\n\nTAKEAWAY\nBatteries win.\n"
+    assert renderer.render(digest, "podcast") == "HEADLINE Grid storage surges. TAKEAWAY Batteries win.\n"
+    assert renderer.render(digest, "email").startswith("## HEADLINE\n")
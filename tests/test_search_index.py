@@ -0,0 +1,92 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.search_index import SearchIndex
+
+ROOT = Path(__file__).resolve().parents[1]
+SAMPLE = ROOT / "digests" / "20240607_Sample.md"
+
+
+@pytest.fixture
+def index(tmp_path):
+    with SearchIndex(tmp_path / "index.sqlite") as idx:
+        yield idx
+
+
+@pytest.fixture
+def digest(tmp_path):
+    md = tmp_path / "20240608_Grid.md"
+    md.write_text(
+        "# Section 1: Headlines\n"
+        "- 📰 [Grid storage surges](https://example.com/grid). Batteries outpace gas peakers.\n\n"
+        "# Section 2: Key Insights\n"
+        "- 💡 Utilities rethink transmission planning.\n",
+        encoding="utf-8",
+    )
+    return md
+
+
+def test_index_sections_bullets_links_and_social(index, digest, tmp_path):
+    social = tmp_path / "20240608_Grid.json"
+    social.write_text(json.dumps({"mastodon": "Batteries beat peakers ⚡", "insights": ["Storage wins"]}))
+    assert index.index_digest(digest, social)
+    assert index.index_digest(SAMPLE)
+
+    kinds = {h.kind for h in index.search("batteries")}
+    assert kinds == {"section", "bullet", "social"}
+    link = index.search("grid storage", kind="link")[0]
+    assert (link.url, link.date, link.stem) == ("https://example.com/grid", "2024-06-08", digest.stem)
+    assert [h.stem for h in index.search("market bullet")] == [SAMPLE.stem, SAMPLE.stem]
+
+
+def test_reindex_is_incremental(index, digest):
+    assert index.index_digest(digest)
+    assert not index.index_digest(digest)
+
+    digest.write_text("# Section 1: Headlines\n- 📰 Hydrogen hubs stall.\n", encoding="utf-8")
+    assert index.index_digest(digest)
+    assert index.search("batteries") == []
+    assert len(index.search("hydrogen")) == 2
+
+
+def test_previously_covered_and_query_escaping(index, digest):
+    index.index_digest(digest)
+    hits = index.previously_covered("New grid batteries announced; transmission upgrades")
+    assert hits and hits[0].kind == "section"
+    assert index.previously_covered("grid", exclude=digest.stem) == []
+    assert index.search('grid* "(') != []
+    assert index.search("   ") == []
+
+
+def test_date_comes_from_digest_and_is_corrected(index, digest):
+    assert index.index_digest(digest, date="2026-10-19")
+    assert index.search("batteries")[0].date == "2026-10-19"
+    assert index.index_digest(digest)
+    assert {h.date for h in index.search("batteries")} == {"2024-06-08"}
+    assert not index.index_digest(digest)
+
+
+def test_preamble_of_subheading_digest_is_indexed(index, tmp_path):
+    md = tmp_path / "20240609_Pipeline.md"
+    md.write_text("## HEADLINE\n- 📰 Offshore wind auction clears record capacity.\n", encoding="utf-8")
+    assert index.index_digest(md)
+    hit = index.search("offshore wind", kind="section")[0]
+    assert (hit.stem, hit.section) == (md.stem, "")
+    assert index.search("offshore wind", kind="bullet")
+
+
+def test_rebuild_purges_removed_digests(index, tmp_path):
+    digest_dir = tmp_path / "digests"
+    digest_dir.mkdir()
+    keep, drop = digest_dir / "20240610_Keep.md", digest_dir / "20240611_Drop.md"
+    keep.write_text("# Headlines\n- 📰 Tidal turbines.\n", encoding="utf-8")
+    drop.write_text("# Headlines\n- 📰 Geothermal boom.\n", encoding="utf-8")
+    assert index.rebuild(digest_dir, tmp_path) == 2
+
+    drop.unlink()
+    assert index.rebuild(digest_dir, tmp_path) == 1
+    assert index.search("geothermal") == []
+    assert [h.stem for h in index.search("tidal", kind="bullet")] == [keep.stem]
+    assert index.rebuild(digest_dir, tmp_path) == 0